@@ -18,6 +18,7 @@ setup(
     author_email="alexei.chetroi@outlook.com",
     license="GPL-3.0",
     packages=find_packages(exclude=["*.tests"]),
+    python_requires=">=3.8",
     install_requires=[
         "attrs",
         "pyserial-asyncio",
@@ -27,9 +28,9 @@ setup(
         "coloredlogs",
     ],
     tests_require=[
-        "asynctest",
         "pytest>=5.4.5",
         "pytest-asyncio>=0.12.0",
         "pytest-mock",
+        'uvloop; sys_platform != "win32"',
     ],
 )
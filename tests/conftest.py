@@ -0,0 +1,10 @@
+import sys
+import asyncio
+
+
+def pytest_configure(config):
+    # uvloop is a test dependency everywhere except on Windows, which it doesn't support
+    if sys.platform != "win32":
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
@@ -35,8 +35,7 @@ def pytest_mark_asyncio_timeout(*, seconds=1):
         @pytest.mark.asyncio
         @functools.wraps(func)
         async def replacement(*args, **kwargs):
-            async with async_timeout.timeout(seconds):
-                return await func(*args, **kwargs)
+            return await asyncio.wait_for(func(*args, **kwargs), timeout=seconds)
 
         return replacement
 
@@ -149,6 +148,10 @@ async def test_znp_responses(znp):
     await asyncio.sleep(0)
     assert not znp._response_listeners
 
+    # Unhandled responses don't create any listener entries
+    znp.frame_received(response.to_frame())
+    assert not znp._response_listeners
+
 
 @pytest_mark_asyncio_timeout()
 async def test_znp_response_timeouts(znp):
@@ -355,6 +358,7 @@ async def test_znp_response_callbacks(znp, event_loop):
     )  # Exceptions should not interfere with other callbacks
 
     async_callback_responses = []
+    async_callbacks_done = asyncio.Event()
 
     # XXX: I can't get AsyncMock().call_count to work, even though
     # the callback is definitely being called
@@ -362,6 +366,9 @@ async def test_znp_response_callbacks(znp, event_loop):
         await asyncio.sleep(0)
         async_callback_responses.append(response)
 
+        if len(async_callback_responses) >= 3:
+            async_callbacks_done.set()
+
     good_response1 = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.CAP_SYS)
     good_response2 = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.CAP_APP)
     good_response3 = c.Util.TimeAlive.Rsp(Seconds=12)
@@ -404,7 +411,12 @@ async def test_znp_response_callbacks(znp, event_loop):
     assert sync_callback.call_count == 3
     assert bad_sync_callback.call_count == 3
 
-    await asyncio.sleep(0.1)
+    await async_callbacks_done.wait()
+
+    # Give any extra callback tasks a chance to run so the count below can catch them
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
     # assert async_callback.call_count == 3  # XXX: this always returns zero
     assert len(async_callback_responses) == 3
 
@@ -762,8 +774,8 @@ async def test_api_cancel_all_listeners(znp, event_loop):
     with pytest.raises(asyncio.CancelledError):
         await future
 
-    # add_done_callback won't be executed immediately
-    await asyncio.sleep(0.1)
+    # add_done_callback won't be executed immediately, only on the next iteration
+    await asyncio.sleep(0)
 
     assert len(znp._response_listeners) == 1
 
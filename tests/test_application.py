@@ -1,13 +1,9 @@
 import asyncio
 import logging
 
-import pytest
+from unittest.mock import AsyncMock
 
-try:
-    # Python 3.8 already has this
-    from mock import AsyncMock as CoroutineMock
-except ImportError:
-    from asynctest import CoroutineMock
+import pytest
 
 import zigpy
 import zigpy_znp.types as t
@@ -20,6 +16,7 @@ from zigpy.zdo.types import ZDOCmd, SizePrefixedSimpleDescriptor
 from zigpy_znp.uart import ZnpMtProtocol
 
 from zigpy_znp.api import ZNP
+from zigpy_znp.frames import TransportFrame
 from zigpy_znp.uart import connect as uart_connect
 from zigpy_znp.types.nvids import NwkNvIds
 from zigpy_znp.zigbee.application import ControllerApplication
@@ -33,6 +30,68 @@ from test_api import (  # noqa: F401
 
 LOGGER = logging.getLogger(__name__)
 
+TEST_IEEE = t.EUI64(range(8))
+TEST_EXTENDED_PAN_ID = t.ExtendedPanId(range(8))
+TEST_NETWORK_KEY = t.KeyData(range(16))
+TEST_TC_LINK_KEY = t.KeyData(range(8))
+
+# Simulated NVRAM contents of a radio with a formed network
+DEFAULT_NVRAM = {
+    NwkNvIds.HAS_CONFIGURED_ZSTACK3: b"\x55",
+    NwkNvIds.NIB: (
+        b"\xCB\x05\x02\x33\x14\x33\x00\x1E\x00\x00\x00\x01\x05\x01\x8F"
+        b"\x00\x07\x00\x02\x05\x1E\x00\x00\x00\x19\x00\x00\x00\x00\x00"
+        b"\x00\x00\x00\x00\x00\x00\x95\x86\x08\x00\x00\x80\x10\x02\x0F"
+        b"\x0F\x04\x00\x01\x00\x00\x00\x01\x00\x00\x00\x00\xA8\x60\xCA"
+        b"\x53\xDB\x3B\xC0\xA8\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+        b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+        b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0F\x03\x00"
+        b"\x01\x78\x0A\x01\x00\x00\x00\xB7\x15\x00\x00"
+    ),
+    NwkNvIds.EXTENDED_PAN_ID: b"\xA8\x60\xCA\x53\xDB\x3B\xC0\xA8",
+    NwkNvIds.EXTADDR: b"\x5C\xAC\xAA\x1C\x00\x4B\x12\x00",
+    NwkNvIds.CHANLIST: b"\x00\x80\x10\x02",
+    NwkNvIds.PANID: b"\x95\x86",
+}
+
+
+def serialize_response(response):
+    return TransportFrame(response.to_frame()).serialize()
+
+
+# Responses that never change between tests
+PING_RSP_DATA = serialize_response(c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities(1625)))
+VERSION_RSP_DATA = serialize_response(
+    c.SYS.Version.Rsp(
+        TransportRev=2,
+        ProductId=1,
+        MajorRel=2,
+        MinorRel=7,
+        MaintRel=1,
+        CodeRevision=20200417,
+        BootloaderBuildType=c.sys.BootloaderBuildType.NON_BOOTLOADER_BUILD,
+        BootloaderRevision=0xFFFFFFFF,
+    )
+)
+
+RESET_IND = c.SYS.ResetInd.Callback(
+    Reason=t.ResetReason.PowerUp,
+    TransportRev=2,
+    ProductId=1,
+    MajorRel=2,
+    MinorRel=7,
+    MaintRel=1,
+)
+
+DEVICE_INFO_RSP = c.Util.GetDeviceInfo.Rsp(
+    Status=t.Status.SUCCESS,
+    IEEE=t.EUI64.deserialize(DEFAULT_NVRAM[NwkNvIds.EXTADDR])[0],
+    NWK=t.NWK(0xFFFE),
+    DeviceType=t.DeviceTypeCapabilities(7),
+    DeviceState=t.DeviceState.InitializedNotStarted,
+    AssociatedDevices=[],
+)
+
 
 class ForwardingTransport:
     class serial:
@@ -42,11 +101,39 @@ class ForwardingTransport:
     def __init__(self, protocol):
         self.protocol = protocol
 
+        # Writes made within one loop iteration are delivered as a single chunk
+        self._pending = bytearray()
+        self._scheduled = False
+        self._closed = False
+
     def write(self, data):
-        LOGGER.debug("Sending data %s to %s via %s", data, self.protocol, self)
+        if self._closed:
+            return
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Sending data %s to %s via %s", data, self.protocol, self)
+
+        self._pending += data
+
+        if not self._scheduled:
+            asyncio.get_running_loop().call_soon(self._flush)
+            self._scheduled = True
+
+    def _flush(self):
+        # Like a real transport, nothing is delivered once the connection is lost
+        if self._closed:
+            return
+
+        data = bytes(self._pending)
+        self._pending.clear()
+        self._scheduled = False
+
         self.protocol.data_received(data)
 
     def close(self, exc=None):
+        self._closed = True
+        self._pending.clear()
+
         self.protocol.connection_lost(exc)
 
     def __repr__(self):
@@ -65,63 +152,100 @@ class ServerZNP(ZNP):
         )
 
     def ping_replier(self, request):
-        self.send(c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities(1625)))
+        self._uart._transport_write(PING_RSP_DATA)
 
     def version_replier(self, request):
-        self.send(
-            c.SYS.Version.Rsp(
-                TransportRev=2,
-                ProductId=1,
-                MajorRel=2,
-                MinorRel=7,
-                MaintRel=1,
-                CodeRevision=20200417,
-                BootloaderBuildType=c.sys.BootloaderBuildType.NON_BOOTLOADER_BUILD,
-                BootloaderRevision=0xFFFFFFFF,
-            )
-        )
+        self._uart._transport_write(VERSION_RSP_DATA)
+
+    def _prepare_responses(self, responses):
+        # Static responses never change so they only need to be serialized once
+        return [(r, None if callable(r) else serialize_response(r)) for r in responses]
+
+    def _materialize(self, request, responses):
+        debug = LOGGER.isEnabledFor(logging.DEBUG)
+
+        for response, data in responses:
+            if debug:
+                LOGGER.debug("Replying to %s with %s", request, response)
+
+            if data is None:
+                response = response(request)
+
+                if response is None:
+                    continue
+
+                data = serialize_response(response)
+
+            yield data
+
+    def _reply(self, request, responses):
+        # Writes are only delivered to the client on the next loop iteration, so the
+        # first response (usually the SRSP) can be sent right from the listener
+        self._send_data(self._materialize(request, responses[:1]))
+
+        if len(responses) == 1:
+            return None
+
+        # Only multi-response scripts need a task
+        return self._send_callbacks(request, responses[1:])
+
+    async def _send_callbacks(self, request, responses):
+        # The client needs a chance to process the SRSP before the callbacks arrive,
+        # which can then be delivered all at once
+        await asyncio.sleep(0)
+        self._send_data(self._materialize(request, responses))
 
     def reply_once_to(self, request, responses):
+        responses = self._prepare_responses(responses)
         called_future = asyncio.get_running_loop().create_future()
 
-        async def callback(request):
+        async def finish_reply(request, remaining):
+            await remaining
+            called_future.set_result(request)
+
+        def callback(request):
+            # Only the first matching request gets a reply
             if callback.called:
-                return
+                return None
 
             callback.called = request
 
-            for response in responses:
-                await asyncio.sleep(0.001)
-                LOGGER.debug("Replying to %s with %s", request, response)
+            # Spent listeners would otherwise pile up and be checked against every
+            # later frame. They can't be removed while frames are being dispatched.
+            asyncio.get_running_loop().call_soon(self._discard_listener, listener)
 
-                if callable(response):
-                    self.send(response(request))
-                else:
-                    self.send(response)
+            remaining = self._reply(request, responses)
 
-            called_future.set_result(request)
+            if remaining is None:
+                called_future.set_result(request)
+                return None
+
+            return finish_reply(request, remaining)
 
         callback.called = False
-        self.callback_for_response(request, lambda r: asyncio.create_task(callback(r)))
+        listener = self.callback_for_response(request, callback)
 
         return called_future
 
+    def _discard_listener(self, listener):
+        (header,) = listener.matching_headers()
+
+        # Tests can reset the listeners before this runs
+        if listener in self._response_listeners.get(header, []):
+            self._remove_listener(listener)
+
     def reply_to(self, request, responses):
-        async def callback(request):
-            callback.call_count += 1
+        responses = self._prepare_responses(responses)
 
-            for response in responses:
-                await asyncio.sleep(0.001)
-                LOGGER.debug("Replying to %s with %s", request, response)
+        def callback(request):
+            callback.call_count += 1
 
-                if callable(response):
-                    self.send(response(request))
-                else:
-                    self.send(response)
+            # The listener runs the returned coroutine (if any) in the background
+            return self._reply(request, responses)
 
         callback.call_count = 0
 
-        self.callback_for_response(request, lambda r: asyncio.create_task(callback(r)))
+        self.callback_for_response(request, callback)
 
         return callback
 
@@ -129,59 +253,84 @@ class ServerZNP(ZNP):
         if response is not None:
             self._uart.send(response.to_frame())
 
+    def send_many(self, responses):
+        self._send_data(serialize_response(r) for r in responses if r is not None)
 
-@pytest.fixture
-async def znp_server(mocker):
-    device = "/dev/ttyFAKE0"
-    config = config_for_port_path(device)
+    def _send_data(self, chunks):
+        # All of the frames are written to the client at once
+        data = b"".join(chunks)
 
-    server_znp = ServerZNP(config)
-    server_znp._uart = ZnpMtProtocol(server_znp)
+        if data:
+            self._uart._transport_write(data)
+
+
+def connect_in_process(server_znp, client_protocol):
+    # Client writes go to the server
+    client_transport = ForwardingTransport(server_znp._uart)
 
-    def passthrough_serial_conn(loop, protocol_factory, url, *args, **kwargs):
-        fut = loop.create_future()
-        assert url == device
+    # Server writes go to the client
+    server_transport = ForwardingTransport(client_protocol)
 
-        client_protocol = protocol_factory()
+    # Once both are setup, notify each one of their transport
+    server_znp._uart.connection_made(server_transport)
+    client_protocol.connection_made(client_transport)
 
-        # Client writes go to the server
-        client_transport = ForwardingTransport(server_znp._uart)
+    return client_transport, client_protocol
 
-        # Server writes go to the client
-        server_transport = ForwardingTransport(client_protocol)
 
-        # Once both are setup, notify each one of their transport
-        server_znp._uart.connection_made(server_transport)
-        client_protocol.connection_made(client_transport)
+class SerialPassthrough:
+    """
+    Connects every new serial connection to the current fake server.
+    """
 
-        fut.set_result((client_transport, client_protocol))
+    def __init__(self):
+        self.server_znp = None
 
-        return fut
+    async def create_serial_connection(
+        self, loop, protocol_factory, url, *args, **kwargs
+    ):
+        assert url == self.server_znp._port_path
 
-    mocker.patch("serial_asyncio.create_serial_connection", new=passthrough_serial_conn)
+        return connect_in_process(self.server_znp, protocol_factory())
+
+
+def make_server_znp():
+    server_znp = ServerZNP(config_for_port_path("/dev/ttyFAKE0"))
+    server_znp._uart = ZnpMtProtocol(server_znp)
+
+    return server_znp
+
+
+@pytest.fixture(scope="module")
+def serial_passthrough(module_mocker):
+    # Patching once per module is enough, tests just swap out the server
+    passthrough = SerialPassthrough()
+    module_mocker.patch(
+        "serial_asyncio.create_serial_connection",
+        new=passthrough.create_serial_connection,
+    )
+
+    return passthrough
+
+
+@pytest.fixture
+async def znp_server(serial_passthrough):
+    server_znp = make_server_znp()
+    serial_passthrough.server_znp = server_znp
 
     return server_znp
 
 
 def make_application(znp_server):
-    app = ControllerApplication(config_for_port_path("/dev/ttyFAKE0"))
+    # The application validates (and copies) the config itself, no need to do it twice
+    app = ControllerApplication(znp_server._config)
 
     # Handle the entire startup sequence
     znp_server.reply_to(
-        request=c.SYS.ResetReq.Req(Type=t.ResetType.Soft),
-        responses=[
-            c.SYS.ResetInd.Callback(
-                Reason=t.ResetReason.PowerUp,
-                TransportRev=2,
-                ProductId=1,
-                MajorRel=2,
-                MinorRel=7,
-                MaintRel=1,
-            )
-        ],
+        request=c.SYS.ResetReq.Req(Type=t.ResetType.Soft), responses=[RESET_IND],
     )
 
-    active_eps = [1, 2]
+    active_eps = {1, 2}
 
     znp_server.reply_to(
         request=c.ZDO.ActiveEpReq.Req(DstAddr=0x0000, NWKAddrOfInterest=0x0000),
@@ -191,7 +340,7 @@ def make_application(znp_server):
                 Src=0x0000,
                 Status=t.ZDOStatus.SUCCESS,
                 NWK=0x0000,
-                ActiveEndpoints=active_eps,
+                ActiveEndpoints=sorted(active_eps),
             ),
         ],
     )
@@ -199,8 +348,7 @@ def make_application(znp_server):
     def on_endpoint_registration(req):
         assert req.Endpoint not in active_eps
 
-        active_eps.append(req.Endpoint)
-        active_eps.sort(reverse=True)
+        active_eps.add(req.Endpoint)
 
         return c.AF.Register.Rsp(Status=t.Status.SUCCESS)
 
@@ -225,6 +373,7 @@ def make_application(znp_server):
         ),
         responses=[
             c.AppConfig.BDBStartCommissioning.Rsp(Status=t.Status.SUCCESS),
+            c.ZDO.StateChangeInd.Callback(State=t.DeviceState.StartedAsCoordinator),
             c.AppConfig.BDBCommissioningNotification.Callback(
                 Status=c.app_config.BDBCommissioningStatus.Success,
                 Mode=c.app_config.BDBCommissioningMode.NwkSteering,
@@ -234,23 +383,7 @@ def make_application(znp_server):
     )
 
     # Simulate a bit of NVRAM
-    nvram = {
-        NwkNvIds.HAS_CONFIGURED_ZSTACK3: b"\x55",
-        NwkNvIds.NIB: (
-            b"\xCB\x05\x02\x33\x14\x33\x00\x1E\x00\x00\x00\x01\x05\x01\x8F"
-            b"\x00\x07\x00\x02\x05\x1E\x00\x00\x00\x19\x00\x00\x00\x00\x00"
-            b"\x00\x00\x00\x00\x00\x00\x95\x86\x08\x00\x00\x80\x10\x02\x0F"
-            b"\x0F\x04\x00\x01\x00\x00\x00\x01\x00\x00\x00\x00\xA8\x60\xCA"
-            b"\x53\xDB\x3B\xC0\xA8\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00"
-            b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
-            b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0F\x03\x00"
-            b"\x01\x78\x0A\x01\x00\x00\x00\xB7\x15\x00\x00"
-        ),
-        NwkNvIds.EXTENDED_PAN_ID: b"\xA8\x60\xCA\x53\xDB\x3B\xC0\xA8",
-        NwkNvIds.EXTADDR: b"\x5C\xAC\xAA\x1C\x00\x4B\x12\x00",
-        NwkNvIds.CHANLIST: b"\x00\x80\x10\x02",
-        NwkNvIds.PANID: b"\x95\x86",
-    }
+    nvram = DEFAULT_NVRAM.copy()
 
     def nvram_write(req):
         nvram[req.Id] = req.Value
@@ -280,17 +413,7 @@ def make_application(znp_server):
     )
 
     znp_server.reply_to(
-        request=c.Util.GetDeviceInfo.Req(),
-        responses=[
-            c.Util.GetDeviceInfo.Rsp(
-                Status=t.Status.SUCCESS,
-                IEEE=t.EUI64.deserialize(nvram[NwkNvIds.EXTADDR])[0],
-                NWK=t.NWK(0xFFFE),
-                DeviceType=t.DeviceTypeCapabilities(7),
-                DeviceState=t.DeviceState.InitializedNotStarted,
-                AssociatedDevices=[],
-            )
-        ],
+        request=c.Util.GetDeviceInfo.Req(), responses=[DEVICE_INFO_RSP],
     )
 
     znp_server.reply_to(
@@ -311,7 +434,94 @@ def application(znp_server):
     return make_application(znp_server)
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest.fixture(scope="module")
+def event_loop():
+    # Every test in this module shares a loop so that `shared_application` can be used
+    loop = asyncio.new_event_loop()
+
+    asyncio.set_event_loop(loop)
+
+    yield loop
+
+    # Finalize the loop the same way `asyncio.run` does so that background tasks
+    # from the last tests don't get destroyed while still pending
+    pending = asyncio.all_tasks(loop)
+
+    for task in pending:
+        task.cancel()
+
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.run_until_complete(loop.shutdown_asyncgens())
+
+    asyncio.set_event_loop(None)
+    loop.close()
+
+    # A fresh policy (of the type installed in conftest.py) lets tests in other
+    # modules implicitly create a new loop
+    asyncio.set_event_loop_policy(type(asyncio.get_event_loop_policy())())
+
+
+@pytest.fixture(scope="module")
+async def shared_application(event_loop, serial_passthrough):
+    """
+    Application that is started only once per module. Use `started_application`.
+    """
+
+    app, znp_server = make_application(make_server_znp())
+
+    serial_passthrough.server_znp = znp_server
+    await app.startup(auto_form=False)
+
+    yield app, znp_server
+
+    await app.shutdown()
+
+
+@pytest.fixture
+async def started_application(shared_application):
+    """
+    Already-started application for tests that do not reconnect or reconfigure it.
+    Devices, app attributes, server listeners, and NVRAM are reset after every test
+    and any tasks created by the test are cancelled.
+    """
+
+    app, znp_server = shared_application
+
+    tasks = asyncio.all_tasks()
+    devices = app.devices.copy()
+    listeners = {h: ls.copy() for h, ls in znp_server._response_listeners.items()}
+    nvram = znp_server._nvram_state.copy()
+    ping_replier = znp_server.ping_replier
+    app_attrs = vars(app).copy()
+
+    yield app, znp_server
+
+    # Background tasks (e.g. zigpy device initialization) would otherwise leak into
+    # the next test and could hold the request lock
+    new_tasks = asyncio.all_tasks() - tasks - {asyncio.current_task()}
+
+    for task in new_tasks:
+        task.cancel()
+
+    await asyncio.gather(*new_tasks, return_exceptions=True)
+
+    app.devices.clear()
+    app.devices.update(devices)
+
+    znp_server._response_listeners.clear()
+    znp_server._response_listeners.update(listeners)
+
+    znp_server._nvram_state.clear()
+    znp_server._nvram_state.update(nvram)
+
+    znp_server.ping_replier = ping_replier
+
+    # Tests replace methods by assigning mocks directly to the app
+    vars(app).clear()
+    vars(app).update(app_attrs)
+
+
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_application_startup_skip_bootloader(application, mocker):
     app, znp_server = application
 
@@ -346,7 +556,7 @@ async def test_application_startup_skip_bootloader(application, mocker):
     assert first_uart_byte == c.ubl.BootloaderRunMode.FORCE_RUN
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_application_startup_nib_cc26x2(application):
     app, znp_server = application
 
@@ -359,7 +569,7 @@ async def test_application_startup_nib_cc26x2(application):
     assert app.zigpy_device.model == "CC13X2/CC26X2"
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_application_startup_nib_cc2531(application):
     app, znp_server = application
 
@@ -379,7 +589,7 @@ async def test_application_startup_nib_cc2531(application):
     assert app.zigpy_device.model == "CC2531"
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_application_startup_endpoints(application):
     app, znp_server = application
 
@@ -391,15 +601,17 @@ async def test_application_startup_endpoints(application):
     assert len(endpoints) == 2
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_application_startup_failure(application):
     app, znp_server = application
 
     # Prevent the fixture's default response
     znp_server._response_listeners[c.SYS.OSALNVRead.Req.header].clear()
 
+    read_configured = c.SYS.OSALNVRead.Req(Id=NwkNvIds.HAS_CONFIGURED_ZSTACK3, Offset=0)
+
     znp_server.reply_once_to(
-        request=c.SYS.OSALNVRead.Req(Id=NwkNvIds.HAS_CONFIGURED_ZSTACK3, Offset=0),
+        request=read_configured,
         responses=[c.SYS.OSALNVRead.Rsp(Status=t.Status.INVALID_PARAMETER, Value=b"")],
     )
 
@@ -408,7 +620,7 @@ async def test_application_startup_failure(application):
         await app.startup(auto_form=False)
 
     znp_server.reply_once_to(
-        request=c.SYS.OSALNVRead.Req(Id=NwkNvIds.HAS_CONFIGURED_ZSTACK3, Offset=0),
+        request=read_configured,
         responses=[c.SYS.OSALNVRead.Rsp(Status=t.Status.SUCCESS, Value=b"\x00")],
     )
 
@@ -450,8 +662,8 @@ async def test_application_startup_led_mode(application):
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_permit_join(application):
-    app, znp_server = application
+async def test_permit_join(started_application):
+    app, znp_server = started_application
 
     # Handle the ZDO broadcast sent by Zigpy
     data_req_sent = znp_server.reply_once_to(
@@ -471,7 +683,6 @@ async def test_permit_join(application):
         ],
     )
 
-    await app.startup(auto_form=False)
     await app.permit(time_s=10)
 
     # Make sure both commands were received
@@ -479,8 +690,8 @@ async def test_permit_join(application):
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_permit_join_failure(application):
-    app, znp_server = application
+async def test_permit_join_failure(started_application):
+    app, znp_server = started_application
 
     # Handle the ZDO broadcast sent by Zigpy
     data_req_sent = znp_server.reply_once_to(
@@ -500,8 +711,6 @@ async def test_permit_join_failure(application):
         ],
     )
 
-    await app.startup(auto_form=False)
-
     with pytest.raises(RuntimeError):
         await app.permit(time_s=10)
 
@@ -510,25 +719,25 @@ async def test_permit_join_failure(application):
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_on_zdo_relays_message_callback(application, mocker):
-    app, znp_server = application
-    await app.startup(auto_form=False)
+async def test_on_zdo_relays_message_callback(started_application, mocker):
+    app, znp_server = started_application
 
     device = mocker.Mock()
-    mocker.patch.object(app, "get_device", return_value=device)
+    app.get_device = mocker.Mock(return_value=device)
 
     znp_server.send(c.ZDO.SrcRtgInd.Callback(DstAddr=0x1234, Relays=[0x5678, 0xABCD]))
+    await asyncio.sleep(0)
+
     assert device.relays == [0x5678, 0xABCD]
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_on_zdo_device_announce(application, mocker):
-    app, znp_server = application
-    await app.startup(auto_form=False)
+async def test_on_zdo_device_announce(started_application, mocker):
+    app, znp_server = started_application
 
-    mocker.patch.object(app, "handle_message")
+    app.handle_message = mocker.Mock()
 
-    device = app.add_device(ieee=t.EUI64(range(8)), nwk=0xFA9E)
+    device = app.add_device(ieee=TEST_IEEE, nwk=0xFA9E)
 
     znp_server.send(
         c.ZDO.EndDeviceAnnceInd.Callback(
@@ -538,52 +747,49 @@ async def test_on_zdo_device_announce(application, mocker):
             Capabilities=c.zdo.MACCapabilities.Router,
         )
     )
+    await asyncio.sleep(0)
 
     app.handle_message.called_once_with(cluster=ZDOCmd.Device_annce)
 
 
+@pytest.mark.parametrize(
+    "handler,callback,handler_kwargs",
+    [
+        (
+            "handle_join",
+            c.ZDO.TCDevInd.Callback(SrcNwk=0x1234, SrcIEEE=TEST_IEEE, ParentNwk=0x0001),
+            dict(nwk=0x1234, ieee=TEST_IEEE, parent_nwk=0x0001),
+        ),
+        (
+            "handle_leave",
+            c.ZDO.LeaveInd.Callback(
+                NWK=0x1234, IEEE=TEST_IEEE, Request=False, Remove=False, Rejoin=False,
+            ),
+            dict(nwk=0x1234, ieee=TEST_IEEE),
+        ),
+    ],
+)
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_on_zdo_device_join(application, mocker):
-    app, znp_server = application
-    await app.startup(auto_form=False)
-
-    mocker.patch.object(app, "handle_join")
-
-    nwk = 0x1234
-    ieee = t.EUI64(range(8))
-
-    znp_server.send(c.ZDO.TCDevInd.Callback(SrcNwk=nwk, SrcIEEE=ieee, ParentNwk=0x0001))
-    app.handle_join.assert_called_once_with(nwk=nwk, ieee=ieee, parent_nwk=0x0001)
-
-
-@pytest_mark_asyncio_timeout(seconds=3)
-async def test_on_zdo_device_leave_callback(application, mocker):
-    app, znp_server = application
-    await app.startup(auto_form=False)
+async def test_on_zdo_device_join_leave(
+    started_application, mocker, handler, callback, handler_kwargs
+):
+    app, znp_server = started_application
 
-    mocker.patch.object(app, "handle_leave")
+    setattr(app, handler, mocker.Mock())
 
-    nwk = 0x1234
-    ieee = t.EUI64(range(8))
+    znp_server.send(callback)
+    await asyncio.sleep(0)
 
-    znp_server.send(
-        c.ZDO.LeaveInd.Callback(
-            NWK=nwk, IEEE=ieee, Request=False, Remove=False, Rejoin=False
-        )
-    )
-    app.handle_leave.assert_called_once_with(nwk=nwk, ieee=ieee)
+    getattr(app, handler).assert_called_once_with(**handler_kwargs)
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_on_af_message_callback(application, mocker):
-    app, znp_server = application
-    await app.startup(auto_form=False)
+async def test_on_af_message_callback(started_application, mocker):
+    app, znp_server = started_application
 
     device = mocker.Mock()
-    mocker.patch.object(
-        app, "get_device", side_effect=[device, KeyError("No such device")]
-    )
-    mocker.patch.object(app, "handle_message")
+    app.get_device = mocker.Mock(side_effect=[device, KeyError("No such device")])
+    app.handle_message = mocker.Mock()
 
     af_message = c.AF.IncomingMsg.Callback(
         GroupId=1,
@@ -603,6 +809,8 @@ async def test_on_af_message_callback(application, mocker):
 
     # Normal message
     znp_server.send(af_message)
+    await asyncio.sleep(0)
+
     app.get_device.assert_called_once_with(nwk=0xABCD)
     device.radio_details.assert_called_once_with(lqi=19, rssi=None)
     app.handle_message.assert_called_once_with(
@@ -615,6 +823,8 @@ async def test_on_af_message_callback(application, mocker):
 
     # Message from an unknown device
     znp_server.send(af_message)
+    await asyncio.sleep(0)
+
     app.get_device.assert_called_once_with(nwk=0xABCD)
     assert device.radio_details.call_count == 0
     assert app.handle_message.call_count == 0
@@ -633,33 +843,39 @@ async def test_probe(pingable_serial_port):  # noqa: F811
     )
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_reconnect(event_loop, application):
     app, znp_server = application
     app._config[conf.CONF_ZNP_CONFIG][conf.CONF_AUTO_RECONNECT_RETRY_DELAY] = 0.01
 
     await app.startup(auto_form=False)
 
-    # Don't reply to the ping request this time
+    # Don't reply to the first ping request, only to the retry that follows it
     old_ping_replier = znp_server.ping_replier
-    znp_server.ping_replier = lambda request: None
+    first_ping = event_loop.create_future()
+
+    def ping_replier(request):
+        if not first_ping.done():
+            first_ping.set_result(request)
+            return
+
+        old_ping_replier(request)
+
+    znp_server.ping_replier = ping_replier
 
     # Now that we're connected, close the connection due to an error
-    SREQ_TIMEOUT = 0.2
+    SREQ_TIMEOUT = 0.05
     app._config[conf.CONF_ZNP_CONFIG][conf.CONF_SREQ_TIMEOUT] = SREQ_TIMEOUT
     app._znp._uart.connection_lost(RuntimeError("Uh oh"))
     app.connection_lost(RuntimeError("Uh oh"))
 
     assert app._znp is None
 
-    # Wait for the SREQ_TIMEOUT to pass, we should fail to reconnect
-    await asyncio.sleep(SREQ_TIMEOUT + 0.1)
+    # The first reconnect attempt pings the radio and gets no reply
+    await first_ping
     assert app._znp is None
 
-    # Respond to the ping appropriately
-    znp_server.ping_replier = old_ping_replier
-
-    # Our reconnect task should complete after we send the ping reply
+    # Our reconnect task should complete once the retried ping is answered
     reconnect_fut = event_loop.create_future()
     app._reconnect_task.add_done_callback(lambda _: reconnect_fut.set_result(None))
 
@@ -714,8 +930,8 @@ async def test_shutdown(mocker, application):
 
     await app.startup(auto_form=False)
 
-    mocker.patch.object(app, "_reconnect_task")
-    mocker.patch.object(app, "_znp")
+    app._reconnect_task = mocker.Mock()
+    app._znp = mocker.Mock()
 
     await app.shutdown()
 
@@ -724,11 +940,10 @@ async def test_shutdown(mocker, application):
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_zdo_request_interception(application, mocker):
-    app, znp_server = application
-    await app.startup(auto_form=False)
+async def test_zdo_request_interception(started_application, mocker):
+    app, znp_server = started_application
 
-    device = app.add_device(ieee=t.EUI64(range(8)), nwk=0xFA9E)
+    device = app.add_device(ieee=TEST_IEEE, nwk=0xFA9E)
 
     # Send back a request response
     active_ep_req = znp_server.reply_once_to(
@@ -771,14 +986,14 @@ async def test_zdo_request_interception(application, mocker):
     assert status == t.Status.SUCCESS
 
 
-@pytest_mark_asyncio_timeout(seconds=10)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_zigpy_request(application, mocker):
     app, znp_server = application
     await app.startup(auto_form=False)
 
     TSN = 1
 
-    device = app.add_device(ieee=t.EUI64(range(8)), nwk=0xAABB)
+    device = app.add_device(ieee=TEST_IEEE, nwk=0xAABB)
     device.status = zigpy.device.Status.ENDPOINTS_INIT
     device.initializing = False
 
@@ -826,14 +1041,14 @@ async def test_zigpy_request(application, mocker):
     await data_req
 
 
-@pytest_mark_asyncio_timeout(seconds=10)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_zigpy_request_failure(application, mocker):
     app, znp_server = application
     await app.startup(auto_form=False)
 
     TSN = 1
 
-    device = app.add_device(ieee=t.EUI64(range(8)), nwk=0xAABB)
+    device = app.add_device(ieee=TEST_IEEE, nwk=0xAABB)
     device.status = zigpy.device.Status.ENDPOINTS_INIT
     device.initializing = False
 
@@ -873,15 +1088,15 @@ async def test_zigpy_request_failure(application, mocker):
 @pytest.mark.parametrize(
     "use_ieee,dev_addr",
     [
-        (True, t.AddrModeAddress(mode=t.AddrMode.IEEE, address=t.EUI64(range(8)))),
+        (True, t.AddrModeAddress(mode=t.AddrMode.IEEE, address=TEST_IEEE)),
         (False, t.AddrModeAddress(mode=t.AddrMode.NWK, address=t.NWK(0xAABB))),
     ],
 )
 async def test_request_use_ieee(application, mocker, use_ieee, dev_addr):
     app, znp_server = application
-    device = app.add_device(ieee=t.EUI64(range(8)), nwk=0xAABB)
+    device = app.add_device(ieee=TEST_IEEE, nwk=0xAABB)
 
-    mocker.patch.object(app, "_send_request", new=CoroutineMock())
+    app._send_request = AsyncMock()
 
     await app.request(
         device,
@@ -914,7 +1129,7 @@ async def test_update_network_noop(mocker, application):
         await app.update_network(reset=True)
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_update_network_extensive(mocker, caplog, application):
     app, znp_server = application
 
@@ -923,9 +1138,9 @@ async def test_update_network_extensive(mocker, caplog, application):
 
     channel = t.uint8_t(20)
     pan_id = t.PanId(0x1234)
-    extended_pan_id = t.ExtendedPanId(range(8))
+    extended_pan_id = TEST_EXTENDED_PAN_ID
     channels = t.Channels.from_channel_list([11, 15, 20])
-    network_key = t.KeyData(range(16))
+    network_key = TEST_NETWORK_KEY
 
     bdb_set_primary_channel = znp_server.reply_once_to(
         request=c.AppConfig.BDBSetChannel.Req(IsPrimary=True, Channel=channels),
@@ -951,8 +1166,8 @@ async def test_update_network_extensive(mocker, caplog, application):
             extended_pan_id=extended_pan_id,
             network_key=network_key,
             pan_id=pan_id,
-            tc_address=t.EUI64(range(8)),
-            tc_link_key=t.KeyData(range(8)),
+            tc_address=TEST_IEEE,
+            tc_link_key=TEST_TC_LINK_KEY,
             update_id=0,
             reset=True,
         )
@@ -960,8 +1175,7 @@ async def test_update_network_extensive(mocker, caplog, application):
     # We should receive a few warnings for `tc_` stuff
     assert len(caplog.records) >= 2
 
-    await bdb_set_primary_channel
-    await bdb_set_secondary_channel
+    await asyncio.gather(bdb_set_primary_channel, bdb_set_secondary_channel)
 
     app._reset.assert_called_once_with()
 
@@ -973,7 +1187,7 @@ async def test_update_network_extensive(mocker, caplog, application):
     assert app.extended_pan_id == extended_pan_id
 
 
-@pytest_mark_asyncio_timeout(seconds=5)
+@pytest_mark_asyncio_timeout(seconds=3)
 async def test_update_network_bad_channel(mocker, caplog, application):
     app, znp_server = application
 
@@ -985,14 +1199,12 @@ async def test_update_network_bad_channel(mocker, caplog, application):
 
 
 @pytest_mark_asyncio_timeout(seconds=3)
-async def test_force_remove(application, mocker):
-    app, znp_server = application
-
-    await app.startup(auto_form=False)
+async def test_force_remove(started_application, mocker):
+    app, znp_server = started_application
 
     mocker.patch("zigpy_znp.zigbee.application.ZDO_REQUEST_TIMEOUT", new=0.3)
 
-    device = app.add_device(ieee=t.EUI64(range(8)), nwk=0xAABB)
+    device = app.add_device(ieee=TEST_IEEE, nwk=0xAABB)
     device.status = zigpy.device.Status.ENDPOINTS_INIT
     device.initializing = False
 
@@ -1015,7 +1227,13 @@ async def test_force_remove(application, mocker):
     assert app.get_device(nwk=device.nwk) is device
 
     await app.remove(device.ieee)
-    await asyncio.gather(bad_mgmt_leave_req, good_mgmt_leave_req)
+
+    # Both requests were answered by the time the device is removed
+    leave_reqs = {bad_mgmt_leave_req, good_mgmt_leave_req}
+    done, pending = await asyncio.wait(leave_reqs, timeout=0.3)
+
+    assert done == leave_reqs
+    assert not pending
 
     # Make sure the device is gone once we remove it
     with pytest.raises(KeyError):
@@ -1026,7 +1244,7 @@ async def test_force_remove(application, mocker):
 async def test_auto_form_unnecessary(application, mocker):
     app, znp_server = application
 
-    mocker.patch.object(app, "form_network", new=CoroutineMock())
+    app.form_network = AsyncMock()
 
     await app.startup(auto_form=True)
     assert app.form_network.call_count == 0
@@ -1039,19 +1257,9 @@ async def test_auto_form_necessary(application, mocker):
 
     nvram.pop(NwkNvIds.HAS_CONFIGURED_ZSTACK3)
 
-    mocker.patch.object(app, "update_network", new=CoroutineMock())
+    app.update_network = AsyncMock()
     mocker.spy(app, "_reset")
 
-    znp_server.reply_to(
-        request=c.AppConfig.BDBStartCommissioning.Req(
-            Mode=c.app_config.BDBCommissioningMode.NwkFormation
-        ),
-        responses=[
-            c.AppConfig.BDBStartCommissioning.Rsp(Status=t.Status.SUCCESS),
-            c.ZDO.StateChangeInd.Callback(State=t.DeviceState.StartedAsCoordinator),
-        ],
-    )
-
     znp_server.reply_to(
         request=c.AppConfig.BDBStartCommissioning.Req(
             Mode=c.app_config.BDBCommissioningMode.NwkSteering
@@ -1090,7 +1298,7 @@ async def test_unclean_shutdown(application, mocker):
 async def test_mrequest(application, mocker):
     app, znp_server = application
 
-    mocker.patch.object(app, "_send_request", new=CoroutineMock())
+    app._send_request = AsyncMock()
     group = app.groups.add_group(0x1234, "test group")
 
     await group.endpoint.on_off.on()
@@ -1206,91 +1414,91 @@ async def test_new_device_join_and_bind(application, mocker):
     def data_req_callback(request):
         if request.Data == bytes([0x00, request.TSN]) + b"\x00\x04\x00\x05\x00":
             # Manufacturer + model
-            znp_server.send(c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS))
-            znp_server.send(
-                c.AF.DataConfirm.Callback(
-                    Status=t.Status.SUCCESS,
-                    Endpoint=request.SrcEndpoint,
-                    TSN=request.TSN,
-                )
-            )
-            znp_server.send(
-                c.AF.IncomingMsg.Callback(
-                    GroupId=0x0000,
-                    ClusterId=request.ClusterId,
-                    SrcAddr=nwk,
-                    SrcEndpoint=request.DstEndpoint,
-                    DstEndpoint=request.SrcEndpoint,
-                    WasBroadcast=t.Bool.false,
-                    LQI=156,
-                    SecurityUse=t.Bool.false,
-                    TimeStamp=2123652,
-                    TSN=0,
-                    Data=b"\x18"
-                    + bytes([request.TSN])
-                    + b"\x01\x04\x00\x00\x42\x07\x50\x68\x69\x6C\x69\x70\x73\x05\x00"
-                    + b"\x00\x42\x06\x53\x4D\x4C\x30\x30\x31",
-                    MacSrcAddr=nwk,
-                    MsgResultRadius=29,
-                )
+            znp_server.send_many(
+                [
+                    c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS),
+                    c.AF.DataConfirm.Callback(
+                        Status=t.Status.SUCCESS,
+                        Endpoint=request.SrcEndpoint,
+                        TSN=request.TSN,
+                    ),
+                    c.AF.IncomingMsg.Callback(
+                        GroupId=0x0000,
+                        ClusterId=request.ClusterId,
+                        SrcAddr=nwk,
+                        SrcEndpoint=request.DstEndpoint,
+                        DstEndpoint=request.SrcEndpoint,
+                        WasBroadcast=t.Bool.false,
+                        LQI=156,
+                        SecurityUse=t.Bool.false,
+                        TimeStamp=2123652,
+                        TSN=0,
+                        Data=b"\x18"
+                        + bytes([request.TSN])
+                        + b"\x01\x04\x00\x00\x42\x07\x50\x68\x69\x6C\x69\x70\x73"
+                        + b"\x05\x00\x00\x42\x06\x53\x4D\x4C\x30\x30\x31",
+                        MacSrcAddr=nwk,
+                        MsgResultRadius=29,
+                    ),
+                ]
             )
         elif request.Data == bytes([0x00, request.TSN]) + b"\x00\x04\x00":
             # Manufacturer
-            znp_server.send(c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS))
-            znp_server.send(
-                c.AF.DataConfirm.Callback(
-                    Status=t.Status.SUCCESS,
-                    Endpoint=request.SrcEndpoint,
-                    TSN=request.TSN,
-                )
-            )
-            znp_server.send(
-                c.AF.IncomingMsg.Callback(
-                    GroupId=0x0000,
-                    ClusterId=request.ClusterId,
-                    SrcAddr=nwk,
-                    SrcEndpoint=request.DstEndpoint,
-                    DstEndpoint=request.SrcEndpoint,
-                    WasBroadcast=t.Bool.false,
-                    LQI=156,
-                    SecurityUse=t.Bool.false,
-                    TimeStamp=2123652,
-                    TSN=0,
-                    Data=b"\x18"
-                    + bytes([request.TSN])
-                    + b"\x01\x04\x00\x00\x42\x07\x50\x68\x69\x6C\x69\x70\x73",
-                    MacSrcAddr=nwk,
-                    MsgResultRadius=29,
-                )
+            znp_server.send_many(
+                [
+                    c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS),
+                    c.AF.DataConfirm.Callback(
+                        Status=t.Status.SUCCESS,
+                        Endpoint=request.SrcEndpoint,
+                        TSN=request.TSN,
+                    ),
+                    c.AF.IncomingMsg.Callback(
+                        GroupId=0x0000,
+                        ClusterId=request.ClusterId,
+                        SrcAddr=nwk,
+                        SrcEndpoint=request.DstEndpoint,
+                        DstEndpoint=request.SrcEndpoint,
+                        WasBroadcast=t.Bool.false,
+                        LQI=156,
+                        SecurityUse=t.Bool.false,
+                        TimeStamp=2123652,
+                        TSN=0,
+                        Data=b"\x18"
+                        + bytes([request.TSN])
+                        + b"\x01\x04\x00\x00\x42\x07\x50\x68\x69\x6C\x69\x70\x73",
+                        MacSrcAddr=nwk,
+                        MsgResultRadius=29,
+                    ),
+                ]
             )
         elif request.Data == bytes([0x00, request.TSN]) + b"\x00\x05\x00":
             # Model
-            znp_server.send(c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS))
-            znp_server.send(
-                c.AF.DataConfirm.Callback(
-                    Status=t.Status.SUCCESS,
-                    Endpoint=request.SrcEndpoint,
-                    TSN=request.TSN,
-                )
-            )
-            znp_server.send(
-                c.AF.IncomingMsg.Callback(
-                    GroupId=0x0000,
-                    ClusterId=request.ClusterId,
-                    SrcAddr=nwk,
-                    SrcEndpoint=request.DstEndpoint,
-                    DstEndpoint=request.SrcEndpoint,
-                    WasBroadcast=t.Bool.false,
-                    LQI=156,
-                    SecurityUse=t.Bool.false,
-                    TimeStamp=2123652,
-                    TSN=0,
-                    Data=b"\x18"
-                    + bytes([request.TSN])
-                    + b"\x01\x05\x00\x00\x42\x06\x53\x4D\x4C\x30\x30\x31",
-                    MacSrcAddr=nwk,
-                    MsgResultRadius=29,
-                )
+            znp_server.send_many(
+                [
+                    c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS),
+                    c.AF.DataConfirm.Callback(
+                        Status=t.Status.SUCCESS,
+                        Endpoint=request.SrcEndpoint,
+                        TSN=request.TSN,
+                    ),
+                    c.AF.IncomingMsg.Callback(
+                        GroupId=0x0000,
+                        ClusterId=request.ClusterId,
+                        SrcAddr=nwk,
+                        SrcEndpoint=request.DstEndpoint,
+                        DstEndpoint=request.SrcEndpoint,
+                        WasBroadcast=t.Bool.false,
+                        LQI=156,
+                        SecurityUse=t.Bool.false,
+                        TimeStamp=2123652,
+                        TSN=0,
+                        Data=b"\x18"
+                        + bytes([request.TSN])
+                        + b"\x01\x05\x00\x00\x42\x06\x53\x4D\x4C\x30\x30\x31",
+                        MacSrcAddr=nwk,
+                        MsgResultRadius=29,
+                    ),
+                ]
             )
 
     znp_server.callback_for_response(
@@ -1342,8 +1550,12 @@ async def test_new_device_join_and_bind(application, mocker):
         our_ep = request.Address.endpoint
         assert app.get_device(nwk=0x0000).endpoints[our_ep].profile_id == ep.profile_id
 
-        znp_server.send(c.ZDO.BindReq.Rsp(Status=t.Status.SUCCESS))
-        znp_server.send(c.ZDO.BindRsp.Callback(Src=nwk, Status=t.ZDOStatus.SUCCESS))
+        znp_server.send_many(
+            [
+                c.ZDO.BindReq.Rsp(Status=t.Status.SUCCESS),
+                c.ZDO.BindRsp.Callback(Src=nwk, Status=t.ZDOStatus.SUCCESS),
+            ]
+        )
 
     znp_server.callback_for_response(
         c.ZDO.BindReq.Req(Dst=nwk, Src=ieee, partial=True), bind_req_callback
@@ -57,6 +57,15 @@ def test_command_setters():
                 assert perms[0].type == cmd_type
 
 
+def test_command_header_lookup_tables():
+    # Header fields are looked up by index, so every possible value must be defined
+    for value in range(0x20):
+        assert t.CommandHeader(value).subsystem is t.Subsystem(value)
+
+    for value in range(0x08):
+        assert t.CommandHeader(value << 5).type is t.CommandType(value)
+
+
 def test_error_code():
     data = b"\x03"
     extra = b"the rest of the owl\x00\xff"
@@ -64,11 +73,15 @@ def test_error_code():
     r, rest = t.ErrorCode.deserialize(data + extra)
     assert rest == extra
     assert r == 0x03
-    assert r.name == "INVALID_PARAMETER"
+    assert r is t.ErrorCode.INVALID_PARAMETER
 
     r, rest = t.ErrorCode.deserialize(b"\xaa" + extra)
     assert rest == extra
     assert r.name == "unknown_0xAA"
+    assert type(r) is t.ErrorCode
+
+    with pytest.raises(ValueError):
+        t.ErrorCode.deserialize(b"")
 
 
 def _validate_schema(schema):
@@ -409,6 +422,21 @@ def test_command_immutability():
 
     assert command1 == command2
 
+    # The hash is cached and not affected by the attempted changes above
+    assert hash(command1) == hash(command1) == hash(command2)
+
+    # Lists can be modified in place, so the hash must follow them
+    command3 = c.SYS.SetExtAddr.Req(ExtAddr=t.EUI64(range(8)))
+    command4 = c.SYS.SetExtAddr.Req(ExtAddr=t.EUI64(range(8)))
+    hash(command3)
+
+    command3.ExtAddr[0] = 0xFF
+    command4.ExtAddr[0] = 0xFF
+
+    assert command3 == command4
+    assert hash(command3) == hash(command4)
+    assert command4 in {command3: True}
+
 
 def test_command_serialization():
     command = c.SYS.NVWrite.Req(
@@ -418,6 +446,19 @@ def test_command_serialization():
 
     assert frame.data == bytes.fromhex("12 5634 9078 0000 06") + b"asdfoo"
 
+    # The serialized data is cached but every call returns a new frame
+    frame2 = command.to_frame()
+
+    assert frame2 == frame
+    assert frame2 is not frame
+
+    # Lists can be modified in place so commands with them are always re-serialized
+    command = c.ZDO.SrcRtgInd.Callback(DstAddr=0x1234, Relays=[0x5678])
+    assert command.to_frame().data == bytes.fromhex("3412 01 7856")
+
+    command.Relays.append(0x9ABC)
+    assert command.to_frame().data == bytes.fromhex("3412 02 7856 BC9A")
+
     # Partial frames cannot be serialized
     with pytest.raises(ValueError):
         partial1 = c.SYS.NVWrite.Req(partial=True, SysId=0x12)
@@ -431,6 +472,42 @@ def test_command_serialization():
         partial2.to_frame()
 
 
+def test_command_packed_serialization():
+    # Fixed-width schemas are serialized with a single struct
+    command = c.AF.DataRetrieve.Req(TimeStamp=0x12345678, Index=0xABCD, Length=0x20)
+    assert command._packer is not None
+
+    frame = command.to_frame()
+    assert frame.data == bytes.fromhex("78563412 CDAB 20")
+    assert c.AF.DataRetrieve.Req.from_frame(frame) == command
+
+    # Variable-width schemas are not
+    assert c.SYS.NVWrite.Req._packer is None
+
+    # Neither are integers resized to a width `struct` does not support
+    class uint16_resized_t(t.uint16_t, size=3):
+        pass
+
+    assert uint16_resized_t._struct_fmt is None
+
+    class TestCommand(
+        t.CommandBase,
+        header=t.CommandHeader(0x0000),
+        schema=t.Schema(
+            (
+                t.Param("Value", uint16_resized_t, "Resized integer"),
+                t.Param("Other", t.uint8_t, "Native integer"),
+            )
+        ),
+    ):
+        pass
+
+    assert TestCommand._packer is None
+
+    command = TestCommand(Value=0x123456, Other=0x78)
+    assert command.to_frame().data == bytes.fromhex("563412 78")
+
+
 def test_command_equality():
     command1 = c.SYS.NVWrite.Req(
         SysId=0x12, ItemId=0x3456, SubId=0x7890, Offset=0x00, Value=b"asdfoo"
@@ -6,7 +6,11 @@ import zigpy_znp.commands as c
 from zigpy_znp.tools.energy_scan import channels_from_channel_mask, main as energy_scan
 
 from test_api import pytest_mark_asyncio_timeout  # noqa: F401
-from test_application import make_application, znp_server  # noqa: F401
+from test_application import (  # noqa: F401
+    make_application,
+    serial_passthrough,
+    znp_server,
+)
 from test_tools_nvram import openable_serial_znp_server  # noqa: F401
 
 
@@ -8,7 +8,7 @@ from zigpy_znp.tools.flash_read import main as flash_read
 from zigpy_znp.tools.flash_write import get_firmware_crcs, main as flash_write
 
 from test_api import pytest_mark_asyncio_timeout  # noqa: F401
-from test_application import znp_server  # noqa: F401
+from test_application import serial_passthrough, znp_server  # noqa: F401
 from test_tools_nvram import openable_serial_znp_server  # noqa: F401
 
 
@@ -14,7 +14,7 @@ from zigpy_znp.tools.nvram_write import main as nvram_write
 
 from test_api import pytest_mark_asyncio_timeout  # noqa: F401
 
-from test_application import znp_server  # noqa: F401
+from test_application import serial_passthrough, znp_server  # noqa: F401
 
 
 # We use an existing backup as an NVRAM model
@@ -100,3 +100,20 @@ def test_struct_converter_2():
 
     test_2 = Nested(4)
     assert test_2.cmd.id_0 == 4
+
+
+def test_struct_slots():
+    network = t.Network(
+        PanId=0x1234,
+        Channel=11,
+        StackProfileVersion=2,
+        BeaconOrderSuperframe=0xFF,
+        PermitJoining=0,
+    )
+
+    assert not hasattr(network, "__dict__")
+    assert isinstance(network.Channel, t.uint8_t)
+
+    data = network.serialize()
+    assert data == b"\x34\x12\x0B\x02\xFF\x00"
+    assert t.Network.deserialize(data + b"extra") == (network, b"extra")
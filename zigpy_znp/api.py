@@ -233,7 +233,8 @@ class ZNP:
 
         matched = False
 
-        for listener in self._response_listeners[command.header]:
+        # Don't use `self._response_listeners[header]`, it would leave an empty list
+        for listener in self._response_listeners.get(command.header, []):
             if not listener.resolve(command):
                 LOGGER.debug("%s does not match %s", command, listener)
                 continue
@@ -244,7 +245,7 @@ class ZNP:
         if not matched:
             LOGGER.warning("Received an unhandled command: %s", command)
 
-    def callback_for_responses(self, responses, callback) -> None:
+    def callback_for_responses(self, responses, callback) -> CallbackResponseListener:
         listener = CallbackResponseListener(responses, callback=callback)
 
         LOGGER.debug("Creating callback %s", listener)
@@ -252,7 +253,9 @@ class ZNP:
         for header in listener.matching_headers():
             self._response_listeners[header].append(listener)
 
-    def callback_for_response(self, response, callback) -> None:
+        return listener
+
+    def callback_for_response(self, response, callback) -> CallbackResponseListener:
         return self.callback_for_responses([response], callback)
 
     def wait_for_responses(self, responses) -> asyncio.Future:
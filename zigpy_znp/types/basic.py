@@ -32,9 +32,14 @@ def serialize_list(objects) -> Bytes:
     return Bytes(b"".join([o.serialize() for o in objects]))
 
 
+# `struct` format characters for the integer sizes it natively supports
+_STRUCT_INT_FORMATS = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+
 class FixedIntType(int):
     _signed = None
     _size = None
+    _struct_fmt = None
 
     def __new__(cls, *args, **kwargs):
         if cls._signed is None or cls._size is None:
@@ -54,6 +59,13 @@ class FixedIntType(int):
         if size is not None:
             cls._size = size
 
+        if cls._signed is not None and cls._size in _STRUCT_INT_FORMATS:
+            fmt = _STRUCT_INT_FORMATS[cls._size]
+            cls._struct_fmt = fmt if cls._signed else fmt.upper()
+        else:
+            # Subclasses can change the size to one `struct` doesn't support
+            cls._struct_fmt = None
+
         if hex_repr:
             fmt = f"0x{{:0{cls._size * 2}X}}"
             cls.__str__ = cls.__repr__ = lambda self: fmt.format(self)
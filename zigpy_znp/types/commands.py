@@ -1,4 +1,5 @@
 import enum
+import struct
 import typing
 import logging
 
@@ -9,14 +10,17 @@ import zigpy_znp.types as t
 
 LOGGER = logging.getLogger(__name__)
 
+# Resolved by `CommandBase.to_frame` on first use
+_GeneralFrame = None
 
-@attr.s
+
+@attr.s(slots=True)
 class BindEntry(t.Struct):
     """Bind table entry."""
 
     Src = attr.ib(type=t.EUI64, converter=t.Struct.converter(t.EUI64))
-    SrcEp = attr.ib(type=t.uint8_t, converter=t.uint8_t)
-    ClusterId = attr.ib(type=t.ClusterId, converter=t.ClusterId)
+    SrcEp = attr.ib(type=t.uint8_t, converter=t.Struct.converter(t.uint8_t))
+    ClusterId = attr.ib(type=t.ClusterId, converter=t.Struct.converter(t.ClusterId))
     DstAddr = attr.ib(
         type=zigpy.zdo.types.MultiAddress,
         converter=t.Struct.converter(zigpy.zdo.types.MultiAddress),
@@ -83,6 +87,12 @@ class Subsystem(t.enum_uint8):
     RESERVED_31 = 0x1F
 
 
+# Every possible subsystem and command type value is defined, so header fields can be
+# looked up by index instead of going through the enum constructor
+_SUBSYSTEMS = tuple(sorted(Subsystem, key=lambda member: member.value))
+_COMMAND_TYPES = tuple(sorted(CommandType, key=lambda member: member.value))
+
+
 class CallbackSubsystem(t.enum_uint16):
     """Subscribe/unsubscribe subsystem callbacks."""
 
@@ -120,13 +130,13 @@ class CommandHeader(t.uint16_t):
         return instance
 
     @property
-    def cmd0(self) -> t.uint8_t:
-        return t.uint8_t(self & 0x00FF)
+    def cmd0(self) -> int:
+        return self & 0x00FF
 
     @property
-    def id(self) -> t.uint8_t:
+    def id(self) -> int:
         """Return CommandHeader id."""
-        return t.uint8_t(self >> 8)
+        return self >> 8
 
     def with_id(self, value: int) -> "CommandHeader":
         """command ID setter."""
@@ -135,7 +145,7 @@ class CommandHeader(t.uint16_t):
     @property
     def subsystem(self) -> Subsystem:
         """Return subsystem of the command."""
-        return Subsystem(self.cmd0 & 0x1F)
+        return _SUBSYSTEMS[self & 0x1F]
 
     def with_subsystem(self, value: Subsystem) -> "CommandHeader":
         return type(self)(self & 0xFFE0 | value & 0x1F)
@@ -143,7 +153,7 @@ class CommandHeader(t.uint16_t):
     @property
     def type(self) -> CommandType:
         """Return command type."""
-        return CommandType(self.cmd0 >> 5)
+        return _COMMAND_TYPES[(self >> 5) & 0x07]
 
     def with_type(self, value) -> "CommandHeader":
         return type(self)(self & 0xFF1F | (value & 0x07) << 5)
@@ -172,6 +182,16 @@ class CommandDef:
     )
 
 
+def _command_class(name: str, qualname: str, header, schema) -> type:
+    """
+    Creates a `CommandBase` subclass with the name it will have in its command.
+    """
+
+    classdict = {"__module__": __name__, "__qualname__": f"{qualname}.{name}"}
+
+    return type(name, (CommandBase,), classdict, header=header, schema=schema)
+
+
 class CommandsMeta(type):
     """
     Metaclass that creates `Command` subclasses out of the `CommandDef` definitions
@@ -202,11 +222,10 @@ class CommandsMeta(type):
                 "Callback": None,
             }
 
-            header = (
-                CommandHeader()
-                .with_id(definition.command_id)
-                .with_type(definition.command_type)
-                .with_subsystem(subsystem)
+            header = CommandHeader(
+                (definition.command_id & 0xFF) << 8
+                | (definition.command_type & 0x07) << 5
+                | subsystem & 0x1F
             )
 
             rsp_header = header
@@ -217,11 +236,7 @@ class CommandsMeta(type):
                 # AREQ doesn't necessarily mean it's a callback
                 # Some requests don't have any response at all
                 if definition.command_type == CommandType.AREQ:
-
-                    class Req(CommandBase, header=header, schema=definition.req_schema):
-                        pass
-
-                    Req.__qualname__ = qualname + ".Req"
+                    Req = _command_class("Req", qualname, header, definition.req_schema)
                     Req.Req = Req
                     Req.Rsp = None
                     Req.Callback = None
@@ -230,23 +245,18 @@ class CommandsMeta(type):
                     req_header = header
                     rsp_header = CommandHeader(0x0040 + req_header)
 
-                    class Req(
-                        CommandBase, header=req_header, schema=definition.req_schema
-                    ):
-                        pass
-
-                    class Rsp(
-                        CommandBase, header=rsp_header, schema=definition.rsp_schema
-                    ):
-                        pass
+                    Req = _command_class(
+                        "Req", qualname, req_header, definition.req_schema
+                    )
+                    Rsp = _command_class(
+                        "Rsp", qualname, rsp_header, definition.rsp_schema
+                    )
 
-                    Req.__qualname__ = qualname + ".Req"
                     Req.Req = Req
                     Req.Rsp = Rsp
                     Req.Callback = None
                     helper_class_dict["Req"] = Req
 
-                    Rsp.__qualname__ = qualname + ".Rsp"
                     Rsp.Req = Rsp
                     Rsp.Req = Req
                     Rsp.Callback = None
@@ -256,12 +266,9 @@ class CommandsMeta(type):
 
                 if definition.command_type == CommandType.AREQ:
                     # If there is no request schema, this is a callback
-                    class Callback(
-                        CommandBase, header=header, schema=definition.rsp_schema
-                    ):
-                        pass
-
-                    Callback.__qualname__ = qualname + ".Callback"
+                    Callback = _command_class(
+                        "Callback", qualname, header, definition.rsp_schema
+                    )
                     Callback.Req = None
                     Callback.Rsp = None
                     Callback.Callback = Callback
@@ -277,10 +284,7 @@ class CommandsMeta(type):
                         )  # pragma: no cover
 
                     # If there is no request, this is a just a response
-                    class Rsp(CommandBase, header=header, schema=definition.rsp_schema):
-                        pass
-
-                    Rsp.__qualname__ = qualname + ".Rsp"
+                    Rsp = _command_class("Rsp", qualname, header, definition.rsp_schema)
                     Rsp.Req = None
                     Rsp.Rsp = Rsp
                     Rsp.Callback = None
@@ -303,26 +307,98 @@ class CommandsBase(metaclass=CommandsMeta, subsystem=None):
     pass
 
 
+def _coercible_types(param_type: type) -> typing.Tuple[type, ...]:
+    """
+    Returns the types of values that can be implicitly converted into `param_type`.
+    """
+
+    coercible = []
+
+    if issubclass(param_type, int) and not issubclass(param_type, enum.Enum):
+        coercible.append(int)
+
+    if issubclass(param_type, (t.ShortBytes, t.LongBytes)):
+        coercible.append(bytes)
+
+    if issubclass(param_type, list):
+        coercible.append(list)
+
+    if issubclass(param_type, t.Bool):
+        coercible.append(bool)
+
+    return tuple(coercible)
+
+
+def _build_packer(schema) -> typing.Optional[struct.Struct]:
+    """
+    Builds a single `struct.Struct` that serializes every parameter of a schema at once.
+    Only schemas made up entirely of required, natively packable integers qualify.
+    """
+
+    fmts = []
+
+    for param in schema.parameters:
+        fmt = getattr(param.type, "_struct_fmt", None)
+
+        if (
+            param.optional
+            or fmt is None
+            or param.type.serialize is not t.FixedIntType.serialize
+        ):
+            return None
+
+        fmts.append(fmt)
+
+    if not fmts:
+        return None
+
+    return struct.Struct("<" + "".join(fmts))
+
+
 class CommandBase:
     Req = None
     Rsp = None
     Callback = None
 
+    # Serialized parameters, cached on the first call to `to_frame` if `_cacheable`
+    _frame_data = None
+
+    # Cached on the first call to `__hash__` if `_cacheable`, not every command is
+    # hashable
+    _hash = None
+
     def __init_subclass__(cls, *, header, schema):
         super().__init_subclass__()
         cls.header = header
         cls.schema = schema
 
+        # Everything that only depends on the schema is computed once per command
+        cls._params = tuple(schema.parameters)
+        cls._param_indices = {p.name: i for i, p in enumerate(cls._params)}
+        cls._all_params = frozenset(p.name for p in schema.parameters)
+        cls._optional_params = [p.name for p in schema.parameters if p.optional]
+        cls._required_params = cls._all_params - frozenset(cls._optional_params)
+        cls._coercible_types = tuple(
+            (param, _coercible_types(param.type)) for param in schema.parameters
+        )
+        cls._packer = _build_packer(schema)
+
+        # Values like lists can be modified in place, so anything derived from them
+        # can only be cached when every parameter type is immutable
+        cls._cacheable = all(
+            issubclass(p.type, (int, bytes, str)) for p in schema.parameters
+        )
+
     def __init__(self, *, partial=False, **params):
         super().__setattr__("_partial", partial)
 
-        all_params = [p.name for p in self.schema.parameters]
-        optional_params = [p.name for p in self.schema.parameters if p.optional]
-        given_params = set(params.keys())
-        given_optional = [p for p in params.keys() if p in optional_params]
+        all_params = self._all_params
+        optional_params = self._optional_params
+        given_params = params.keys()
+        given_optional = [p for p in given_params if p in optional_params]
 
-        unknown_params = given_params - set(all_params)
-        missing_params = (set(all_params) - set(optional_params)) - given_params
+        unknown_params = given_params - all_params
+        missing_params = self._required_params - given_params
 
         if unknown_params:
             raise KeyError(
@@ -339,33 +415,21 @@ class CommandBase:
                 )
 
             if missing_params:
-                raise KeyError(f"Missing parameters: {set(all_params) - given_params}")
+                raise KeyError(f"Missing parameters: {all_params - given_params}")
 
-        bound_params = {}
+        # Values are stored in schema order, parameter names are looked up by index
+        values = []
 
-        for param in self.schema.parameters:
+        for param, coercible_types in self._coercible_types:
             if params.get(param.name) is None and (partial or param.optional):
-                bound_params[param.name] = (param, None)
+                values.append(None)
                 continue
 
             value = params[param.name]
 
-            if not isinstance(value, param.type):
-                # fmt: off
-                is_coercible_type = [
-                    isinstance(value, int)
-                    and issubclass(param.type, int)
-                    and not issubclass(param.type, enum.Enum),
-
-                    isinstance(value, bytes)
-                    and issubclass(param.type, (t.ShortBytes, t.LongBytes)),
-
-                    isinstance(value, list) and issubclass(param.type, list),
-                    isinstance(value, bool) and issubclass(param.type, t.Bool),
-                ]
-                # fmt: on
-
-                if any(is_coercible_type):
+            # Values are usually passed with exactly the right type already
+            if type(value) is not param.type and not isinstance(value, param.type):
+                if isinstance(value, coercible_types):
                     value = param.type(value)
                 elif (
                     type(value) is zigpy.zdo.types.SimpleDescriptor
@@ -387,22 +451,33 @@ class CommandBase:
                     f"Invalid parameter value: {param.name}={value!r}"
                 ) from e
 
-            bound_params[param.name] = (param, value)
+            values.append(value)
 
-        super().__setattr__("_bound_params", bound_params)
+        super().__setattr__("_values", tuple(values))
 
     def to_frame(self):
         if self._partial:
             raise ValueError(f"Cannot serialize a partial frame: {self}")
 
-        from zigpy_znp.frames import GeneralFrame
+        global _GeneralFrame
 
-        # At this point the optional params are assumed to be in a valid order
-        data = b"".join(
-            [v.serialize() for p, v in self._bound_params.values() if v is not None]
-        )
+        # `zigpy_znp.frames` imports this module, so it can only be imported at runtime
+        if _GeneralFrame is None:
+            from zigpy_znp.frames import GeneralFrame as _GeneralFrame
+
+        data = self._frame_data
+
+        if data is None:
+            if self._packer is not None:
+                data = self._packer.pack(*self._values)
+            else:
+                # At this point the optional params are assumed to be in a valid order
+                data = b"".join([v.serialize() for v in self._values if v is not None])
 
-        return GeneralFrame(self.header, data)
+            if self._cacheable:
+                super().__setattr__("_frame_data", data)
+
+        return _GeneralFrame(self.header, data)
 
     @classmethod
     def from_frame(cls, frame, *, ignore_unparsed=False) -> "CommandBase":
@@ -412,11 +487,12 @@ class CommandBase:
             )
 
         data = frame.data
-        params = {}
+        values = []
 
-        for param in cls.schema.parameters:
+        for param in cls._params:
             if data:
-                params[param.name], data = param.type.deserialize(data)
+                value, data = param.type.deserialize(data)
+                values.append(value)
             elif not param.optional:
                 # If we're out of data but the parameter is required, this is bad
                 raise ValueError(
@@ -436,22 +512,31 @@ class CommandBase:
                     f"Unparsed data remains in {cls} at the end of the frame: {data!r}"
                 )
 
-        return cls(**params)
+        # Missing optional params are all at the end
+        values.extend([None] * (len(cls._params) - len(values)))
 
-    def matches(self, other: "CommandBase") -> bool:
-        if type(self) is not type(other):
-            return False
+        return cls._from_values(values)
 
-        assert self.header == other.header
+    @classmethod
+    def _from_values(cls, values) -> "CommandBase":
+        """
+        Creates a command from already-deserialized values, skipping `__init__`.
+        Deserialized values have the correct types so there is nothing to validate.
+        """
 
-        param_pairs = zip(self._bound_params.values(), other._bound_params.values())
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "_partial", False)
+        object.__setattr__(instance, "_values", tuple(values))
 
-        for (
-            (expected_param, expected_value),
-            (actual_param, actual_value),
-        ) in param_pairs:
-            assert expected_param == actual_param
+        return instance
+
+    def matches(self, other: "CommandBase") -> bool:
+        if type(self) is not type(other):
+            return False
 
+        # Both commands have the same schema so their parameters are bound in the same
+        # order and no further consistency checks are needed
+        for expected_value, actual_value in zip(self._values, other._values):
             # Only non-None bound params are considered
             if expected_value is not None and expected_value != actual_value:
                 return False
@@ -459,18 +544,25 @@ class CommandBase:
         return True
 
     def __eq__(self, other):
-        return type(self) is type(other) and self._bound_params == other._bound_params
+        return type(self) is type(other) and self._values == other._values
 
     def __hash__(self):
-        params = tuple(self._bound_params.items())
-        return hash((type(self), self.header, self.schema, params))
+        if self._hash is not None:
+            return self._hash
+
+        value = hash((type(self), self.header, self._values))
+
+        # The hash of mutable values must track `__eq__`, it can't be cached
+        if self._cacheable:
+            super().__setattr__("_hash", value)
+
+        return value
 
     def __getattr__(self, key):
-        if key not in self._bound_params:
+        if key not in self._param_indices:
             raise AttributeError(f"{self} has no attribute {key!r}")
 
-        param, value = self._bound_params[key]
-        return value
+        return self._values[self._param_indices[key]]
 
     def __setattr__(self, key, value):
         raise RuntimeError("Command instances are immutable")
@@ -479,7 +571,7 @@ class CommandBase:
         raise RuntimeError("Command instances are immutable")
 
     def __repr__(self):
-        params = [f"{p.name}={v!r}" for p, v in self._bound_params.values()]
+        params = [f"{p.name}={v!r}" for p, v in zip(self._params, self._values)]
 
         return f'{self.__class__.__qualname__}({", ".join(params)})'
 
@@ -528,13 +620,17 @@ class MTCapabilities(t.enum_flag_uint16):
     CAP_UNK16 = 1 << 15
 
 
-@attr.s
+@attr.s(slots=True)
 class Network(t.Struct):
     PanId = attr.ib(type=t.PanId, converter=t.Struct.converter(t.PanId))
-    Channel = attr.ib(type=t.uint8_t, converter=t.uint8_t)
-    StackProfileVersion = attr.ib(type=t.uint8_t, converter=t.uint8_t)
-    BeaconOrderSuperframe = attr.ib(type=t.uint8_t, converter=t.uint8_t)
-    PermitJoining = attr.ib(type=t.uint8_t, converter=t.uint8_t)
+    Channel = attr.ib(type=t.uint8_t, converter=t.Struct.converter(t.uint8_t))
+    StackProfileVersion = attr.ib(
+        type=t.uint8_t, converter=t.Struct.converter(t.uint8_t)
+    )
+    BeaconOrderSuperframe = attr.ib(
+        type=t.uint8_t, converter=t.Struct.converter(t.uint8_t)
+    )
+    PermitJoining = attr.ib(type=t.uint8_t, converter=t.Struct.converter(t.uint8_t))
 
 
 STATUS_SCHEMA = t.Schema(
@@ -1,4 +1,3 @@
-import sys
 import typing
 import logging
 
@@ -157,16 +156,26 @@ class MissingEnumMixin:
         new_member._name_ = f"unknown_0x{value:02X}"
         new_member._value_ = cls._member_type_(value)
 
-        if sys.version_info >= (3, 8):
-            # Show the warning in the calling code, not in this function
-            LOGGER.warning(
-                "Unhandled %s value: %s", cls.__name__, new_member, stacklevel=2
-            )
-        else:
-            LOGGER.warning("Unhandled %s value: %s", cls.__name__, new_member)
+        # Show the warning in the calling code, not in this function
+        LOGGER.warning("Unhandled %s value: %s", cls.__name__, new_member, stacklevel=2)
 
         return new_member
 
+    @classmethod
+    def deserialize(cls, data: bytes) -> typing.Tuple["MissingEnumMixin", bytes]:
+        if len(data) < cls._size:
+            raise ValueError(f"Data is too short to contain {cls._size} bytes")
+
+        value = int.from_bytes(data[: cls._size], "little", signed=cls._signed)
+
+        # Known values skip the enum constructor, only unknown ones need `_missing_`
+        member = cls._value2member_map_.get(value)
+
+        if member is None:
+            member = cls(value)
+
+        return member, data[cls._size :]
+
 
 class Status(MissingEnumMixin, basic.enum_uint8):
     SUCCESS = 0x00
@@ -5,6 +5,9 @@ import typing
 class Struct:
     """Structure based on attr."""
 
+    # Allows subclasses created with `attr.s(slots=True)` to drop their `__dict__`
+    __slots__ = ()
+
     @classmethod
     def deserialize(cls, data: bytes):
         """Deserialize structure."""